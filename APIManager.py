@@ -1,15 +1,97 @@
-import requests
+import httpx
+import atexit
+import csv
 import json
+import logging
+import orjson
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import time
 import pytz
 import os
+import queue
+import re
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
 from tqdm import tqdm
 from typing import List, Optional
 from colorama import Fore, Style, init
 
+# Fuseau horaire de Bruxelles et expressions régulières (codes ANSI, dates '/Date(ms)/'), construits une seule fois au chargement du module
+_BRUSSELS = pytz.timezone('Europe/Brussels')
+_ANSI_RE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
+_DATE_RE = re.compile(r'/Date\((-?\d+)')
+
+# Schéma des messages renvoyés par SensorDataMessages et types explicites des colonnes numériques/répétitives
+_MSG_COLS = ['DataMessageGUID', 'SensorID', 'MessageDate', 'State', 'SignalStrength', 'Voltage', 'Battery',
+             'Data', 'DisplayData', 'PlotValue', 'MetNotificationRequirements', 'GatewayID',
+             'DataValues', 'DataTypes', 'PlotValues', 'PlotLabels']
+_MSG_DTYPES = {'State': 'Int16', 'SignalStrength': 'Int16', 'Battery': 'Int16', 'Voltage': 'float32',
+               'DataTypes': 'category', 'PlotLabels': 'category'}
+
+@dataclass(slots=True)
+class Settings:
+    """
+    Schéma du fichier settings.json. Les clés absentes prennent leur valeur par défaut, les clés inconnues sont refusées.
+    """
+    authorization_token: str
+    sensor_list: List[int]
+    start: str
+    end: str
+    network_id: Optional[int] = None
+    interval_minutes: int = 10
+    verbose: bool = False
+    log_to_file: bool = False
+    rate_limit_per_min: Optional[int] = None
+    max_workers: int = 8
+    format: str = "csv"
+
+    def __post_init__(self):
+        """
+        Vérifie le type et la valeur de chaque paramètre.
+
+        Raises:
+            TypeError: Si un paramètre n'a pas le type attendu.
+            ValueError: Si un paramètre sort des valeurs admises.
+        """
+        for name in ("authorization_token", "start", "end", "format"):
+            if not isinstance(getattr(self, name), str):
+                raise TypeError(f"'{name}' doit être une chaîne de caractères")
+
+        for name in ("verbose", "log_to_file"):
+            if not isinstance(getattr(self, name), bool):
+                raise TypeError(f"'{name}' doit être un booléen (true/false)")
+
+        # bool est une sous-classe de int en Python : il est refusé explicitement
+        def is_int(value):
+            return isinstance(value, int) and not isinstance(value, bool)
+
+        if not isinstance(self.sensor_list, list) or not all(is_int(sensor_id) for sensor_id in self.sensor_list):
+            raise TypeError("'sensor_list' doit être une liste d'entiers")
+
+        if self.network_id is not None and not is_int(self.network_id):
+            raise TypeError("'network_id' doit être un entier")
+
+        for name in ("interval_minutes", "max_workers", "rate_limit_per_min"):
+            value = getattr(self, name)
+            if value is None and name == "rate_limit_per_min":
+                continue
+            if not is_int(value):
+                raise TypeError(f"'{name}' doit être un entier")
+            if value <= 0:
+                raise ValueError(f"'{name}' doit être strictement positif")
+
+        if self.format not in ("csv", "parquet"):
+            raise ValueError(f"'format' doit valoir \"csv\" ou \"parquet\", pas {self.format!r}")
+
 class Monnit:
     """
     Cette classe gère l'interaction avec l'API Monnit pour récupérer la liste des capteurs et les données associées.
@@ -28,28 +110,62 @@ class Monnit:
 
         # Création d'un interrupteur pour un intervalle > à 7 jours
         self.big_window = False
-        self.interval_seconds = self.settings["interval_minutes"] * 60
 
-    def log(self, message:str):
+        # Liste des réseaux et index par nom, remplis par get_network_list()
+        self.network_list = []
+        self._network_by_name = {}
+
+        # Partie fixe des URL de l'API, construite une seule fois
+        self._base_url = "https://www.imonnit.com/json"
+
+        # Client HTTP/2 partagé : les requêtes des différents threads sont multiplexées sur une même connexion
+        self._client = httpx.Client(
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+            # Réponses JSON compressées (décompression transparente par httpx)
+            headers={"Accept": "application/json", "Accept-Encoding": "gzip, deflate"},
+        )
+        atexit.register(self._client.close)
+
+        # Limiteur de débit global : au plus rate_limit_per_min requêtes par minute, ou à défaut
+        # une requête par interval_minutes (même cadence que l'attente imposée d'origine)
+        if self.rate_limit_per_min is None:
+            self._rl_window = self.interval_seconds
+            self._rl = deque(maxlen=1)
+        else:
+            self._rl_window = 60
+            self._rl = deque(maxlen=self.rate_limit_per_min)
+        self._rl_lock = threading.Lock()
+
+        # Événement permettant d'interrompre les attentes du limiteur et de progressbar (arrêt propre, voir stop())
+        self._stop = threading.Event()
+
+        # Plages (capteur, début, fin) déjà exportées, persistées dans output/.done.json pour la reprise
+        self._done_path = os.path.join("output", ".done.json")
+        self._done_lock = threading.Lock()
+        self.load_done_manifest()
+
+    def log(self, message):
         """
         Imprime un message et enregistre dans un fichier de journal si le mode verbeux est activé dans les paramètres.
+        Si ni verbose ni log_to_file ne sont activés, le message n'est pas construit.
 
         Parameters:
-            message (str): Message à imprimer et enregistrer avec des codes d'échappement ANSI.
+            message (str or callable): Message à imprimer et enregistrer avec des codes d'échappement ANSI,
+                ou fonction sans argument le renvoyant (formatage différé).
         """
+        if not (self.verbose or self.log_to_file):
+            return
+
+        if callable(message):
+            message = message()
 
-        if self.settings.get('verbose'):
+        if self.verbose:
             print(message)
 
-        if self.settings.get('log_to_file'):
-            log_file_path = "log.txt"
-            try:
-                with open(log_file_path, 'a', encoding='utf-8') as log_file:
-                    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    cleaned_message = self.strip_ansi(message)
-                    log_file.write(f"{timestamp} | {cleaned_message}\n")
-            except Exception as e:
-                print(f"{Fore.YELLOW}Avertissement :{Style.RESET_ALL} Erreur lors de l'écriture dans le fichier journal, {e}")
+        if self.log_to_file:
+            self._logger.info(self.strip_ansi(message))
 
     def handle_settings_file(self):
         """
@@ -58,23 +174,60 @@ class Monnit:
         Raises:
             FileNotFoundError: Si le fichier settings.json n'est pas trouvé.
             JSONDecodeError: Si le fichier settings.json a un format JSON incorrect.
+            TypeError: Si une clé obligatoire manque, si une clé est inconnue ou si une valeur a un mauvais type (voir Settings).
+            ValueError: Si une valeur sort des valeurs admises (voir Settings).
         """
         print("Exécution de la méthode handle_settings_file()")
         try:
             with open("settings.json", encoding="utf-8") as file:
                 self.settings = json.load(file)
+            config = Settings(**self.settings)
+
+            # Paramètres fixes exposés comme attributs (start et end restent modifiables via self.settings)
+            self.verbose = config.verbose
+            self.log_to_file = config.log_to_file
+            self.interval_seconds = config.interval_minutes * 60
+            self.token = config.authorization_token
+            self.rate_limit_per_min = config.rate_limit_per_min
+            self.max_workers = config.max_workers
+            self.output_format = config.format
+
+            if self.log_to_file:
+                self.setup_file_logger()
 
             self.sensor_list = self.settings["sensor_list"]
             self.log(f"{Fore.GREEN}[INFOS] {Style.RESET_ALL}Paramètres chargés avec succès: {self.settings}")
 
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+        except (FileNotFoundError, json.JSONDecodeError, TypeError, ValueError) as e:
             print(f"{Fore.RED}[ERREUR] {Style.RESET_ALL}Erreur lors de la lecture du fichier de paramètres, {e}")
             sys.exit(1)
 
+    def setup_file_logger(self):
+        """
+        Configure le journal fichier log.txt : les messages sont placés dans une file et écrits par un thread
+        d'arrière-plan (QueueListener) via un unique FileHandler, arrêté à la fin du programme.
+        """
+        self._logger = logging.getLogger("monnit")
+        if self._logger.handlers:
+            # Journal déjà configuré par une autre instance
+            return
+
+        log_queue = queue.Queue(-1)
+        file_handler = logging.FileHandler("log.txt", 'a', encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter("%(asctime)s | %(message)s", datefmt='%Y-%m-%d %H:%M:%S'))
+        listener = QueueListener(log_queue, file_handler)
+        listener.start()
+        atexit.register(listener.stop)
+
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(QueueHandler(log_queue))
+
     def strip_ansi(self, text):
-        # Fonction pour supprimer les codes ANSI de Colorama
-        from re import sub
-        return sub(r'\x1B\[[0-?]*[ -/]*[@-~]', '', text)
+        # Fonction pour supprimer les codes ANSI de Colorama (appelée uniquement pour l'écriture dans le fichier journal)
+        if '\x1b' not in text:
+            return text
+        return _ANSI_RE.sub('', text)
 
     def convert_timestamp_to_datetime(self, timestamp: int):
         """
@@ -88,31 +241,40 @@ class Monnit:
         """
         # self.log("Exécution de la méthode convert_timestamp_to_datetime()")
         try:
-            timestamp = int(timestamp[6:-2]) / 1000
-            utc_datetime = pd.to_datetime(timestamp, unit='s', utc=True)
-            
-            # Définir le fuseau horaire pour Bruxelles (GMT+2)
-            brussels_timezone = pytz.timezone('Europe/Brussels')
-            
-            # Convertir en heure locale de Bruxelles
-            brussels_datetime = utc_datetime.tz_convert(brussels_timezone)
-        
-            # Return au format 'YYYY-MM-DD HH:mm:ss'
-            return brussels_datetime.strftime('%Y-%m-%d %H:%M:%S')
+            ms = int(_DATE_RE.search(timestamp).group(1))
+
+            # Conversion directe en heure locale de Bruxelles, au format 'YYYY-MM-DD HH:mm:ss'
+            return datetime.fromtimestamp(ms / 1000, tz=_BRUSSELS).strftime('%Y-%m-%d %H:%M:%S')
 
         except Exception as e:
 
             self.log(f"{Fore.RED}[ERREUR] {Style.RESET_ALL} lors de la conversion du timestamp en datetime : {e}")
             return None
     
+    def parse_datetime(self, value: str):
+        """
+        Convertit une date au format 'YYYY-MM-DD HH:mm:ss' en objet datetime.
+
+        Parameters:
+            value (str): Date à convertir. Une heure sur un seul chiffre ('2023-12-15 5:00:00') est acceptée.
+
+        Returns:
+            datetime: La date convertie.
+        """
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            # fromisoformat exige une heure sur deux chiffres, strptime est plus tolérant
+            return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+
     def check_for_big_window(self):
         """
         Vérifie si l'intervalle entre start et end est inférieur à une semaine.
         Si non, divise l'intervalle en tranches d'une semaine et stocke les résultats dans self.cover_ranges.
         """
         self.log("Exécution de la méthode check_for_big_window()")
-        start_date = datetime.strptime(self.settings['start'], '%Y-%m-%d %H:%M:%S')
-        end_date = datetime.strptime(self.settings['end'], '%Y-%m-%d %H:%M:%S')
+        start_date = self.parse_datetime(self.settings['start'])
+        end_date = self.parse_datetime(self.settings['end'])
 
         # Déterminer la différence entre les deux dates
         date_difference = end_date - start_date
@@ -121,17 +283,11 @@ class Monnit:
         if date_difference > timedelta(weeks=1):
             self.big_window = True
             self.log(f"{Fore.YELLOW}[AVERTISSEMENT] {Style.RESET_ALL} Fenêtre suppérieur à sept jour détectée")
-            self.cover_ranges=[]
-
-            # Diviser l'intervalle en tranches d'une semaine
-            self.cover_ranges = []
-            current_start = start_date
-            while current_start < end_date:
-                current_end = current_start + timedelta(weeks=1)
-                if current_end > end_date:
-                    current_end = end_date
-                self.cover_ranges.append((current_start.strftime('%Y-%m-%d %H:%M:%S'), current_end.strftime('%Y-%m-%d %H:%M:%S')))
-                current_start = current_end
+
+            # Diviser l'intervalle en tranches d'une semaine (la dernière tranche se termine à end_date)
+            starts = pd.date_range(start_date, end_date, freq='7D', inclusive='left')
+            ends = list(starts[1:]) + [end_date]
+            self.cover_ranges = [(s.strftime('%Y-%m-%d %H:%M:%S'), e.strftime('%Y-%m-%d %H:%M:%S')) for s, e in zip(starts, ends)]
 
             # Utiliser la première tranche comme nouvel intervalle
             self.settings['start'], self.settings['end'] =  self.cover_ranges[0]
@@ -141,19 +297,80 @@ class Monnit:
 
     def progressbar(self, interval_seconds=600, title: str="Délai imposé"):
         """
-        Affiche une barre de progression avec un intervalle spécifié entre les itérations.
+        Attend l'intervalle spécifié, en affichant une barre de progression si le mode verbeux est activé.
+        L'attente peut être interrompue à tout moment via self._stop.set().
 
         Parameters:
-            interval_seconds (int): Intervalle de sommeil entre chaque itération en secondes. Par défaut, 600 secondes (10 minutes).
+            interval_seconds (int): Durée de l'attente en secondes. Par défaut, 600 secondes (10 minutes).
             title (str): Titre de la barre de progression.
         """
         # self.log("Exécution de la méthode progressbar()")
-        # Pour 600 secondes, avec une itération toutes les 10 secondes
-        iterable = range(interval_seconds // 10)  
+        if self.verbose:
+            with tqdm(total=interval_seconds, desc=title, unit="s") as bar:
+                self._stop.wait(interval_seconds)
+                bar.update(interval_seconds)
+        else:
+            self._stop.wait(interval_seconds)
+
+    def _get(self, url: str, params: Optional[dict] = None, throttled: bool = False):
+        """
+        Envoie une requête GET via le client HTTP partagé.
+        Les erreurs réseau (connexion, délai dépassé) et les réponses 502, 503 et 504 sont retentées jusqu'à 3 fois
+        avec une attente exponentielle.
 
-        for _ in tqdm(iterable, desc=title, unit="s"):
-             # Pause de 10 secondes entre les itérations
-            time.sleep(10) 
+        Parameters:
+            url (str): URL de la requête.
+            params (dict, optional): Paramètres de la requête.
+            throttled (bool): Si True, chaque tentative passe par le limiteur de débit (_throttle).
+
+        Returns:
+            httpx.Response or None: La réponse de l'API, ou None si un arrêt a été demandé via stop().
+
+        Raises:
+            httpx.HTTPError: En cas d'erreur réseau ou de code HTTP d'erreur après la dernière tentative.
+        """
+        for attempt in range(4):
+            if throttled and not self._throttle():
+                return None
+            try:
+                response = self._client.get(url, params=params)
+            except httpx.TransportError:
+                if attempt == 3:
+                    raise
+            else:
+                if response.status_code not in (502, 503, 504) or attempt == 3:
+                    break
+            self._stop.wait(0.5 * 2 ** attempt)
+
+        response.raise_for_status()
+        return response
+
+    def _throttle(self):
+        """
+        Bloque jusqu'à ce qu'une nouvelle requête soit autorisée par le limiteur de débit
+        (rate_limit_per_min, ou une requête par interval_minutes si absent).
+        Les rafales sont permises tant que la limite n'est pas atteinte sur la fenêtre glissante.
+
+        Returns:
+            bool: False si l'attente a été interrompue par stop(), la requête ne doit alors pas être envoyée.
+        """
+        with self._rl_lock:
+            if self._stop.is_set():
+                return False
+            now = time.monotonic()
+            if len(self._rl) == self._rl.maxlen:
+                if self._stop.wait(max(0, self._rl_window - (now - self._rl[0]))):
+                    return False
+            self._rl.append(time.monotonic())
+            return True
+
+    def stop(self):
+        """
+        Demande un arrêt propre : interrompt les attentes en cours (limiteur de débit, progressbar)
+        et empêche l'envoi de nouvelles requêtes de données.
+        """
+        self.log(f"{Fore.YELLOW}[AVERTISSEMENT] {Style.RESET_ALL}Arrêt demandé, les requêtes restantes sont annulées.")
+        self._stop.set()
 
     def get_network_list(self):
         """
@@ -163,43 +380,43 @@ class Monnit:
             verbose (bool): Indique si les messages de débogage doivent être affichés. Par défaut, True.
         """
         self.log("Exécution de la méthode get_network_list()")
-        # Initialisation de la liste pour stocker les réseaux
+        # Initialisation de la liste et de l'index par nom pour stocker les réseaux
         self.network_list = []
+        self._network_by_name = {}
 
         # Construction de la requête pour obtenir la liste des réseaux
-        formatted_request = f'https://www.imonnit.com/json/NetworkList/{self.settings["authorization_token"]}?'
+        formatted_request = f"{self._base_url}/NetworkList/{self.token}"
         self.log(f"{Fore.GREEN}[INFOS] {Style.RESET_ALL}Envoi de la requête : {formatted_request}")
 
         # Envoi de la requête et récupération de la réponse
         try:
-            response = requests.get(formatted_request)
-            response.raise_for_status()
-            answer_in_json = response.json()
+            response = self._get(formatted_request)
+            answer_in_json = orjson.loads(response.content)
 
             # Extraction de la liste des réseaux et stockage dans self.network_list
             self.network_list = answer_in_json.get('Result', [])
             self.network_list = [{"NetworkID": net["NetworkID"], "NetworkName": net["NetworkName"]} for net in self.network_list]
+            self._network_by_name = {net["NetworkName"]: net["NetworkID"] for net in self.network_list}
             self.log(f"Liste des réseaux présents : {self.network_list}")
 
-        except requests.RequestException as e:
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
             self.log(f"{Fore.RED}[ERREUR] {Style.RESET_ALL}Erreur lors de la récupération de la liste des réseaux : {e}")
 
-    def find_network_id(self, network_list: List[dict], network_name:str):
+    def find_network_id(self, network_name:str):
         """
-        Trouve l'ID du réseau en fonction du nom.
+        Trouve l'ID du réseau en fonction du nom, parmi les réseaux récupérés par get_network_list().
 
         Parameters:
-            network_list (list): Liste des réseaux sous forme de dictionnaires.
             network_name (str): Nom du réseau à rechercher.
 
         Returns:
             int or None: L'ID du réseau si trouvé, sinon None.
         """
         self.log("Exécution de la méthode find_network_id()")
-        for network in network_list:
-            if network["NetworkName"] == network_name:
-                self.log(f"L'ID du réseau '{network_name}' est : {network['NetworkID']}")
-                return network["NetworkID"]
+        network_id = self._network_by_name.get(network_name)
+        if network_id is not None:
+            self.log(f"L'ID du réseau '{network_name}' est : {network_id}")
+            return network_id
 
         self.log(f"{Fore.RED}[ERREUR] {Style.RESET_ALL}Le réseau '{network_name}' n'a pas été trouvé.")
 
@@ -218,72 +435,228 @@ class Monnit:
         self.sensor_list = []
         
         # Construction de la requête pour obtenir la liste des capteurs
-        formatted_request = f'https://www.imonnit.com/json/SensorList/{self.settings["authorization_token"]}?NetworkID={network_id}'
-        self.log(f"Envoi de la requête : {formatted_request}")
+        formatted_request = f"{self._base_url}/SensorList/{self.token}"
+        params = {'NetworkID': network_id}
+        self.log(f"Envoi de la requête : {formatted_request} {params}")
 
         # Envoi de la requête et récupération de la réponse
         try:
-            response = requests.get(formatted_request)
-            response.raise_for_status()
-            answer_in_json = response.json()
+            response = self._get(formatted_request, params)
+            answer_in_json = orjson.loads(response.content)
 
             # Extraction de la liste des capteurs et stockage dans self.sensor_list
             self.sensor_list = [sensor['SensorID'] for sensor in answer_in_json.get('Result', [])]
             self.log(f"Liste des capteurs présent dans le network:{self.sensor_list}")
 
-        except requests.RequestException as e:
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
             self.log(f"{Fore.RED}[ERREUR] {Style.RESET_ALL} lors de la récupération de la liste des capteurs : {e}")
 
-    def get_data_for_sensor_id(self, sensor_id: int, start: str, end: str):
+    def _output_path(self, sensor_id: int, start: str, end: str):
         """
-        Récupère les données d'un capteur spécifique dans une plage de dates et exporte les données dans un fichier CSV.
+        Construit le chemin du fichier exporté pour un capteur.
+        En CSV, toutes les plages d'un capteur sont ajoutées au même fichier ; en Parquet, un fichier est créé par plage.
 
         Parameters:
             sensor_id (int): L'ID du capteur.
             start (str): Date de début au format 'YYYY-MM-DD HH:mm:ss'.
             end (str): Date de fin au format 'YYYY-MM-DD HH:mm:ss'.
+
+        Returns:
+            str: Chemin du fichier dans le dossier output.
         """
-        self.log("Exécution de la méthode get_data_for_sensor_id()")
- 
+        if self.output_format == "parquet":
+            return os.path.join("output", f"{start.split(' ')[0].replace('-', '')}_{end.split(' ')[0].replace('-', '')}_{sensor_id}.parquet")
+        return os.path.join("output", f"{sensor_id}.csv")
+
+    def load_done_manifest(self):
+        """
+        Charge output/.done.json : les plages déjà exportées ("done") et les ajouts CSV en cours ("pending",
+        chemin -> taille du fichier avant l'ajout). Un ajout resté en cours (arrêt brutal entre l'écriture du CSV
+        et son enregistrement) est annulé en tronquant le fichier à sa taille d'origine.
+
+        Raises:
+            JSONDecodeError: Si le manifeste est illisible ; le programme s'arrête plutôt que de tout retélécharger.
+        """
+        self._done = set()
+        self._pending = {}
+        try:
+            with open(self._done_path, encoding="utf-8") as file:
+                manifest = json.load(file)
+            self._done = {tuple(entry) for entry in manifest["done"]}
+            self._pending = manifest["pending"]
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            self.log(f"{Fore.RED}[ERREUR] {Style.RESET_ALL}Manifeste de reprise '{self._done_path}' illisible, {e}")
+            sys.exit(1)
+
+        for fichier, size in self._pending.items():
+            if os.path.exists(fichier) and os.path.getsize(fichier) > size:
+                os.truncate(fichier, size)
+                self.log(f"{Fore.YELLOW}[AVERTISSEMENT] {Style.RESET_ALL}Ajout interrompu annulé dans '{fichier}'.")
+        if self._pending:
+            self._pending = {}
+            self._save_done_manifest()
+
+    def _save_done_manifest(self):
+        """
+        Écrit output/.done.json via un fichier temporaire remplacé atomiquement (os.replace).
+        À appeler avec self._done_lock acquis (ou avant le démarrage des threads).
+        """
+        tmp_path = self._done_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({"done": sorted(self._done), "pending": self._pending}, file)
+        os.replace(tmp_path, self._done_path)
+
+    def _already_done(self, sensor_id: int, start: str, end: str):
+        """
+        Vérifie si les données d'un capteur pour une plage de dates ont déjà été exportées lors d'une exécution précédente.
+
+        Returns:
+            bool: True si la plage figure dans output/.done.json, sinon False.
+        """
+        if (sensor_id, start, end) in self._done:
+            self.log(lambda: f"{Fore.GREEN}[INFOS] {Style.RESET_ALL}Plage de {start} à {end} déjà exportée, capteur {sensor_id} ignoré.")
+            return True
+        return False
+
+    def _mark_done(self, sensor_id: int, start: str, end: str):
+        """
+        Enregistre une plage exportée dans output/.done.json.
+        """
+        with self._done_lock:
+            self._done.add((sensor_id, start, end))
+            self._pending.pop(self._output_path(sensor_id, start, end), None)
+            self._save_done_manifest()
+
+    def _begin_append(self, fichier: str):
+        """
+        Note la taille d'un fichier CSV avant un ajout, pour pouvoir l'annuler si le programme s'arrête avant _mark_done.
+        """
+        with self._done_lock:
+            self._pending[fichier] = os.path.getsize(fichier) if os.path.exists(fichier) else 0
+            self._save_done_manifest()
+
+    def _fetch_only(self, sensor_id: int, start: str, end: str):
+        """
+        Envoie la requête pour un capteur et exporte les données dans un fichier CSV (ou Parquet), sans attente imposée.
+
+        Parameters:
+            sensor_id (int): L'ID du capteur.
+            start (str): Date de début au format 'YYYY-MM-DD HH:mm:ss'.
+            end (str): Date de fin au format 'YYYY-MM-DD HH:mm:ss'.
+
+        Returns:
+            pd.DataFrame or None: Les données du capteur, ou None en cas d'erreur de requête ou de plage déjà exportée.
+        """
+        # Une plage déjà exportée n'est jamais ajoutée une seconde fois au fichier du capteur
+        if self._already_done(sensor_id, start, end):
+            return None
+
         # Construction de la requête pour obtenir les données du capteur dans la plage de dates spécifiée
-        formatted_request = f'https://www.imonnit.com/json/SensorDataMessages/{self.settings["authorization_token"]}?sensorID={sensor_id}&fromDate={start}&toDate={end}'
-        self.log(f"Envoi de la requête : {formatted_request}")
+        formatted_request = f"{self._base_url}/SensorDataMessages/{self.token}"
+        params = {'sensorID': sensor_id, 'fromDate': start, 'toDate': end}
+        self.log(lambda: f"Envoi de la requête : {formatted_request} {params}")
 
         # Envoi de la requête et récupération de la réponse
         try: 
-            response  = requests.get(formatted_request)
-            response.raise_for_status()
+            # Chaque tentative respecte la limite de débit globale
+            response  = self._get(formatted_request, params, throttled=True)
+            if response is None:
+                return None
 
-            answer_in_json = response.json()
+            answer_in_json = orjson.loads(response.content)
             result = answer_in_json.get('Result')
 
-            # Création d'un DataFrame avec les résultats
-            self.df = pd.DataFrame(result)
+            # Création d'un DataFrame avec les résultats (local au thread appelant) : colonnes connues d'abord,
+            # les champs non prévus dans _MSG_COLS sont conservés à la suite
+            result = result or []
+            extra_cols = list(dict.fromkeys(k for r in result for k in r if k not in _MSG_COLS))
+            if extra_cols:
+                self.log(lambda: f"{Fore.YELLOW}[AVERTISSEMENT] {Style.RESET_ALL}Champs non prévus pour le capteur {sensor_id}, conservés : {extra_cols}")
+            df = pd.DataFrame.from_records(result, columns=_MSG_COLS + extra_cols)
+            for col, dtype in _MSG_DTYPES.items():
+                try:
+                    df[col] = df[col].astype(dtype)
+                except (ValueError, TypeError) as e:
+                    self.log(f"{Fore.YELLOW}[AVERTISSEMENT] {Style.RESET_ALL}Colonne {col} du capteur {sensor_id} laissée sans conversion en {dtype} : {e}")
 
             # Vérifier si le DataFrame n'est pas vide
-            if not self.df.empty:
-                # Appliquer la fonction à la colonne MessageDate
-                self.df['MessageDate'] = self.df['MessageDate'].apply(self.convert_timestamp_to_datetime)
-                self.df['MessageDate'] = pd.to_datetime(self.df['MessageDate'])
-                self.df['MessageDate'] = self.df['MessageDate'].dt.strftime('%Y-%m-%d %H:%M:%S')
-
-                # Exportation du DataFrame vers un fichier CSV
-                fichier_csv = os.path.join("output", f"{start.split(' ')[0].replace('-', '')}_{end.split(' ')[0].replace('-', '')}_{sensor_id}.csv")
-                self.df.to_csv(fichier_csv, index=False)
-
-                self.log(f"{Fore.GREEN}[SUCCESS] {Style.RESET_ALL}Le fichier CSV '{fichier_csv}' a été créé avec succès.")
+            if not df.empty:
+                # Extraction des millisecondes de '/Date(ms)/' directement depuis les enregistrements JSON,
+                # puis conversion vectorisée en heure locale de Bruxelles (conservée en datetime64[ns, Europe/Brussels])
+                matches = [_DATE_RE.search(r.get('MessageDate')) if isinstance(r.get('MessageDate'), str) else None
+                           for r in result]
+                valid = np.fromiter((m is not None for m in matches), dtype=bool, count=len(matches))
+                ms = np.fromiter((int(m.group(1)) if m else 0 for m in matches), dtype=np.int64, count=len(matches))
+                # Les dates absentes ou mal formées deviennent NaT
+                df['MessageDate'] = pd.to_datetime(ms, unit='ms', utc=True).tz_convert(_BRUSSELS).where(valid)
+                if not valid.all():
+                    self.log(lambda: f"{Fore.YELLOW}[AVERTISSEMENT] {Style.RESET_ALL}{(~valid).sum()} date(s) invalide(s) pour le capteur {sensor_id}, remplacée(s) par NaT.")
+
+                # Exportation du DataFrame vers un fichier CSV (ou Parquet si demandé dans settings.json)
+                fichier = self._output_path(sensor_id, start, end)
+
+                # Les colonnes object aux types Python mélangés (ex. "22.5" puis 5) sont converties en texte,
+                # valeurs nulles conservées, car PyArrow refuse de les convertir
+                export_df = df.copy()
+                for col in export_df.columns[export_df.dtypes == object]:
+                    export_df[col] = export_df[col].where(export_df[col].isna(), export_df[col].astype(str))
+
+                if fichier.endswith(".parquet"):
+                    pq.write_table(pa.Table.from_pandas(export_df, preserve_index=False), fichier)
+                else:
+                    # Formatage de MessageDate en 'YYYY-MM-DD HH:mm:ss' (heure de Bruxelles) uniquement à l'écriture
+                    csv_df = export_df.assign(MessageDate=export_df['MessageDate'].dt.strftime('%Y-%m-%d %H:%M:%S'))
+                    # Ajout au fichier du capteur, l'en-tête n'est écrit qu'à la création du fichier
+                    include_header = not (os.path.exists(fichier) and os.path.getsize(fichier) > 0)
+                    if not include_header:
+                        # Le jeu de colonnes est figé par l'en-tête existant : les champs absents de l'en-tête sont ignorés
+                        with open(fichier, newline='', encoding='utf-8') as file:
+                            header = next(csv.reader(file))
+                        dropped_cols = [col for col in csv_df.columns if col not in header]
+                        if dropped_cols:
+                            self.log(f"{Fore.YELLOW}[AVERTISSEMENT] {Style.RESET_ALL}Champs absents de l'en-tête de '{fichier}', non écrits : {dropped_cols}")
+                        csv_df = csv_df.reindex(columns=header)
+                    table = pa.Table.from_pandas(csv_df, preserve_index=False)
+                    self._begin_append(fichier)
+                    with open(fichier, 'ab') as file:
+                        pacsv.write_csv(table, file, pacsv.WriteOptions(include_header=include_header))
+                self._mark_done(sensor_id, start, end)
+
+                self.log(lambda: f"{Fore.GREEN}[SUCCESS] {Style.RESET_ALL}Les données de {start} à {end} ont été écrites dans '{fichier}'.")
             else:
                 self.log(f"{Fore.RED}[ERREUR] {Style.RESET_ALL}La requête a renvoyé une réponse vide.")
-            
-            # Attente imposée
-            self.progressbar(self.interval_seconds)
 
-        except requests.RequestException as e:
+            return df
+
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
             self.log(f"{Fore.RED}[ERREUR]: {Style.RESET_ALL}Erreur lors de la récupération des données pour le capteur {sensor_id} : {e}")
+            return None
+
+        except pa.ArrowException as e:
+            # La plage n'est pas marquée comme exportée : elle sera retentée à la prochaine exécution
+            self.log(f"{Fore.RED}[ERREUR]: {Style.RESET_ALL}Erreur lors de l'export des données du capteur {sensor_id} de {start} à {end} : {e}")
+            return None
+
+    def get_data_for_sensor_id(self, sensor_id: int, start: str, end: str):
+        """
+        Récupère les données d'un capteur spécifique dans une plage de dates et exporte les données dans un fichier CSV.
+
+        Parameters:
+            sensor_id (int): L'ID du capteur.
+            start (str): Date de début au format 'YYYY-MM-DD HH:mm:ss'.
+            end (str): Date de fin au format 'YYYY-MM-DD HH:mm:ss'.
+        """
+        self.log("Exécution de la méthode get_data_for_sensor_id()")
+
+        df = self._fetch_only(sensor_id, start, end)
+        if df is not None:
+            self.df = df
 
     def get_data_for_sensor_list(self, start: str, end: str):
         """
-        Récupère les données pour chaque capteur à intervalles de 10 minutes.
+        Récupère les données de tous les capteurs en parallèle, dans la limite de débit définie par rate_limit_per_min (ou interval_minutes).
 
         Parameters:
             start_date (str): Date de début au format 'YYYY-MM-DD HH:mm:ss'.
@@ -293,9 +666,14 @@ class Monnit:
         # Obtient la liste des capteurs
         sensor_list = self.sensor_list
 
-        for sensor_id in sensor_list:
-            # Exécute GetDataFromSensorID pour chaque capteur
-            self.get_data_for_sensor_id(sensor_id, start, end)
+        # Exécute les requêtes de chaque capteur en parallèle (le client HTTP est partagé entre les threads)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+            try:
+                list(ex.map(lambda sid: self._fetch_only(sid, start, end), sensor_list))
+            except KeyboardInterrupt:
+                # Ctrl+C : les threads en attente sont libérés et les tâches restantes se terminent sans requête
+                self.stop()
+                raise
 
     def process_data_for_sensor_id_based_on_window(self, sensor_id: int):
         """
@@ -311,7 +689,7 @@ class Monnit:
                 range_start = cover_range[0]
                 range_end = cover_range[1]
 
-                self.log(f"{Fore.GREEN}[INFOS] {Style.RESET_ALL}Traitement de la plage de dates de {range_start} à {range_end}")
+                self.log(lambda: f"{Fore.GREEN}[INFOS] {Style.RESET_ALL}Traitement de la plage de dates de {range_start} à {range_end}")
                 self.get_data_for_sensor_id(sensor_id, range_start, range_end)
         else:
             self.get_data_for_sensor_id(sensor_id, self.settings['start'] , self.settings['end'])
@@ -325,7 +703,7 @@ class Monnit:
             for cover_range in self.cover_ranges:
                 range_start = cover_range[0]
                 range_end = cover_range[1]
-                self.log(f"{Fore.GREEN}[INFOS] {Style.RESET_ALL}Traitement de la plage de dates de {range_start} à {range_end}")
+                self.log(lambda: f"{Fore.GREEN}[INFOS] {Style.RESET_ALL}Traitement de la plage de dates de {range_start} à {range_end}")
                 self.get_data_for_sensor_list(range_start, range_end)
         else:
             self.get_data_for_sensor_list(self.settings['start'] , self.settings['end'])
@@ -353,7 +731,7 @@ if __name__ == "__main__":
 
     # Obtention de L'id unique du réseau
     network_name_to_find = 'Labo-GBZ'
-    network_id = api.find_network_id(api.network_list, network_name_to_find)
+    network_id = api.find_network_id(network_name_to_find)
 
     # Récupère la liste des capteurs appartenant aux network_id
     api.get_sensor_list(network_id)